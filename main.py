@@ -2,17 +2,137 @@
 import streamlit as st
 import ee
 import folium
+from folium.plugins import Draw
 from streamlit_folium import st_folium
 import pandas as pd
 import plotly.express as px
 import datetime
 import json
+import os
+import sys
+import time
+import math
+import hashlib
+import heapq
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from array import array
+from collections import deque
 
 # ==========================================
 # 1. SYSTEM CONFIG (MUST BE FIRST)
 # ==========================================
 st.set_page_config(layout="wide", page_title="AgriGeo-Shield: Viksit Bharat", initial_sidebar_state="expanded")
 
+# Opt-in hot-path profiling: ?profile=1 or AGRIGEO_PROFILE=1
+PROFILE_MODE = os.environ.get("AGRIGEO_PROFILE") == "1" or st.query_params.get("profile") == "1"
+PROFILE_LOG = os.environ.get("AGRIGEO_PROFILE_LOG", "profile_log.jsonl")
+PROFILE_LOG_MAX_BYTES = 5 * 1024 * 1024  # rotated to <log>.1 beyond this
+PROFILE_REPLAY_RECORDS = 500
+
+
+class SectionProfiler:
+    """Per-run wall/CPU/EE-call breakdown of the numbered sections.
+
+    mark() closes the running section and opens the next one. CPU time is
+    the script thread's own, so concurrent sessions and pool workers do not
+    leak into it. Work submitted to the EE pool is credited to its
+    submission tag (get_stat, time_series, centroid) with the task's own
+    wall and CPU time, since a section only shows how long the script waited.
+    """
+
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.context = {}
+        self.sections = []
+        self.tasks = {}
+        self.current = None
+        self.flushed = False
+        self.lock = threading.Lock()
+
+    def mark(self, name):
+        if not self.enabled:
+            return
+        wall, cpu = time.perf_counter(), time.thread_time()
+        with self.lock:
+            if self.current is not None:
+                self.current['wall_s'] = round(wall - self.current.pop('_wall0'), 4)
+                self.current['cpu_s'] = round(cpu - self.current.pop('_cpu0'), 4)
+                self.sections.append(self.current)
+            self.current = None if name is None else {
+                'section': name, 'ee_calls': 0, 'ee_bytes': 0, '_wall0': wall, '_cpu0': cpu}
+
+    def _task_bucket(self, label):
+        return self.tasks.setdefault(label, {
+            'tag': label, 'tasks': 0, 'task_wall_s': 0.0, 'task_cpu_s': 0.0, 'ee_calls': 0, 'ee_bytes': 0})
+
+    def record_ee_call(self, nbytes, label=None):
+        with self.lock:
+            bucket = self._task_bucket(label) if label else self.current
+            if bucket is not None:
+                bucket['ee_calls'] += 1
+                bucket['ee_bytes'] += nbytes
+
+    def flush(self):
+        """Close the open section and append this run to PROFILE_LOG, once.
+
+        Called at the end of the page and before every st.stop(), so runs
+        that stop early (e.g. custom ROI errors) are logged too. Returns the
+        OSError if the log could not be written.
+        """
+        if not self.enabled or self.flushed:
+            return None
+        self.flushed = True
+        self.mark(None)
+        record = {'ts': datetime.datetime.now().isoformat(timespec='seconds'),
+                  'context': self.context, 'sections': self.sections,
+                  'pool_tasks': list(self.tasks.values())}
+        try:
+            if os.path.exists(PROFILE_LOG) and os.path.getsize(PROFILE_LOG) > PROFILE_LOG_MAX_BYTES:
+                os.replace(PROFILE_LOG, PROFILE_LOG + ".1")
+            with open(PROFILE_LOG, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            return e
+        return None
+
+    def record_task(self, label, wall, cpu):
+        with self.lock:
+            bucket = self._task_bucket(label)
+            bucket['tasks'] += 1
+            bucket['task_wall_s'] = round(bucket['task_wall_s'] + wall, 4)
+            bucket['task_cpu_s'] = round(bucket['task_cpu_s'] + cpu, 4)
+
+
+def install_ee_call_hooks():
+    # Patched once per process (the sentinel on ee.data survives cache clears);
+    # each thread reports to the run that owns it
+    active = getattr(ee.data, '_agrigeo_profile_local', None)
+    if active is not None:
+        return active
+    active = threading.local()
+
+    def hook(fn):
+        def hooked(*args, **kwargs):
+            result = fn(*args, **kwargs)
+            owner = getattr(active, 'profiler', None)
+            if owner is not None:
+                owner.record_ee_call(len(json.dumps(result, default=str)), getattr(active, 'label', None))
+            return result
+        return hooked
+
+    for name in ('computeValue', 'getMapId'):
+        if hasattr(ee.data, name):
+            setattr(ee.data, name, hook(getattr(ee.data, name)))
+    ee.data._agrigeo_profile_local = active
+    return active
+
+
+profile_local = install_ee_call_hooks()
+profiler = SectionProfiler(PROFILE_MODE)
+profile_local.profiler = profiler if PROFILE_MODE else None
+profiler.mark("1. SYSTEM CONFIG (MUST BE FIRST)")
+
 # ==========================================
 # 2. GEE AUTHENTICATION HANDLER
 # ==========================================
@@ -38,12 +158,14 @@ def ee_authenticate():
             ee.Authenticate()
             ee.Initialize(project='emerald-skill-479306-i0')
 
+profiler.mark("2. GEE AUTHENTICATION HANDLER")
 # *** CRITICAL FIX: RUN AUTHENTICATION HERE BEFORE LOADING DATA ***
 ee_authenticate()
 
 # ==========================================
 # 3. CUSTOM CSS (PREMIUM UI)
 # ==========================================
+profiler.mark("3. CUSTOM CSS (PREMIUM UI)")
 st.markdown("""
 <style>
     /* Metric Card Customization */
@@ -92,6 +214,7 @@ st.markdown("""
 # ==========================================
 # 4. SIDEBAR CONTROLS & STATE DICTIONARIES
 # ==========================================
+profiler.mark("4. SIDEBAR CONTROLS & STATE DICTIONARIES")
 st.sidebar.title("🛠️ AgriGeo-Shield")
 st.sidebar.markdown("### 🌾 Women-Led Agri Intelligence")
 st.sidebar.markdown("---")
@@ -126,11 +249,41 @@ else:
          "Nadia": "Nadia", "Kolkata": "Kolkata",
         "Darjeeling": "Darjiling", "Howrah": "Haora", "Hooghly": "Hugli"
     }
+dist_dict["Custom Region"] = "Custom"
 
 selected_display = st.sidebar.selectbox(
     "Select Target District:", list(dist_dict.keys()))
 target_district_gaul = dist_dict[selected_display]
 
+roi_geojson, roi_point = None, None
+if target_district_gaul == "Custom":
+    roi_source = st.sidebar.radio(
+        "Define Region of Interest:", ["Point + Radius", "Upload GeoJSON", "Draw on Map"])
+    if roi_source == "Point + Radius":
+        roi_lat = st.sidebar.number_input("Latitude:", -90.0, 90.0, 23.2423, format="%.4f")
+        roi_lon = st.sidebar.number_input("Longitude:", -180.0, 180.0, 88.4344, format="%.4f")
+        roi_radius_km = st.sidebar.number_input("Radius (km):", 0.5, 50.0, 15.0, step=0.5)
+        roi_point = (roi_lon, roi_lat, roi_radius_km)
+    elif roi_source == "Upload GeoJSON":
+        roi_file = st.sidebar.file_uploader("Upload Catchment Polygon:", type=["geojson", "json"])
+        if roi_file is not None:
+            if roi_file.size > 2 * 1024 * 1024:
+                st.sidebar.error("ROI file exceeds the 2 MB upload limit.")
+            else:
+                try:
+                    roi_geojson = json.load(roi_file)
+                except ValueError:
+                    st.sidebar.error("Uploaded file is not valid GeoJSON.")
+    else:
+        draw_map = folium.Map(location=[22.0, 79.0], zoom_start=4, tiles="CartoDB positron")
+        Draw(export=False, draw_options={'polyline': False, 'circle': False, 'marker': False,
+                                         'circlemarker': False}).add_to(draw_map)
+        with st.sidebar:
+            draw_out = st_folium(draw_map, width=280, height=280,
+                                 key="roi_draw", returned_objects=["all_drawings"])
+        if draw_out and draw_out.get("all_drawings"):
+            roi_geojson = {'type': 'FeatureCollection', 'features': draw_out["all_drawings"]}
+
 target_year = st.sidebar.slider(
     "Select Primary Target Year:", 2015, 2025, 2024)
 compare_year = st.sidebar.slider(
@@ -155,13 +308,176 @@ analysis_type = st.sidebar.radio(
         "8. Mineral Mapping (Landsat 8)"
     ]
 )
+profiler.context.update({
+    'layer': analysis_type.split('.')[1].strip().replace("(", "").replace(")", ""),
+    'district': selected_display, 'state': target_state, 'year': target_year,
+    'compare_year': compare_year, 'future_mode': future_mode})
 
 # ==========================================
 # 5. DATA LOADING (NOW SAFE TO RUN)
 # ==========================================
-
+profiler.mark("5. DATA LOADING (NOW SAFE TO RUN)")
+
+# Custom ROI budgets: keep a stray giant or over-detailed polygon from stalling a worker
+MAX_ROI_AREA_KM2 = 10000
+MAX_ROI_BBOX_PIXELS = 2e8  # bounding box at Sentinel-2's 10 m, as used by exports
+MAX_ROI_VERTICES = 100000  # hard safety cap; detail below it is simplified away
+ROI_SIMPLIFY_METERS = 100
+
+
+def extract_roi_polygons(geojson):
+    if not isinstance(geojson, dict):
+        raise ValueError("ROI must be a GeoJSON object.")
+    if geojson.get('type') == 'FeatureCollection':
+        features = geojson.get('features', [])
+        if not isinstance(features, list) or not all(isinstance(f, dict) for f in features):
+            raise ValueError("ROI FeatureCollection contains malformed features.")
+        geoms = [f.get('geometry') or {} for f in features]
+    elif geojson.get('type') == 'Feature':
+        geoms = [geojson.get('geometry') or {}]
+    else:
+        geoms = [geojson]
+    polygons = []
+    for g in geoms:
+        if not isinstance(g, dict):
+            raise ValueError("ROI contains a malformed geometry.")
+        if g.get('type') == 'Polygon':
+            polygons.append(g['coordinates'])
+        elif g.get('type') == 'MultiPolygon':
+            polygons.extend(g['coordinates'])
+    return polygons
+
+
+def ring_area_km2(ring):
+    # Spherical excess approximation; accurate enough for a budget check
+    area = 0.0
+    for p1, p2 in zip(ring, ring[1:] + ring[:1]):
+        area += math.radians(p2[0] - p1[0]) * \
+            (2 + math.sin(math.radians(p1[1])) + math.sin(math.radians(p2[1])))
+    return abs(area) * 6371.0088 ** 2 / 2
+
+
+def douglas_peucker(points, tolerance):
+    # Iterative, so long rings cannot hit the recursion limit; returns kept indices
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = points[first], points[last]
+        dx, dy = x2 - x1, y2 - y1
+        seg_len = math.hypot(dx, dy)
+        max_dist, index = 0.0, None
+        for i in range(first + 1, last):
+            px, py = points[i]
+            if seg_len == 0:
+                dist = math.hypot(px - x1, py - y1)
+            else:
+                dist = abs(dy * px - dx * py + x2 * y1 - y2 * x1) / seg_len
+            if dist > max_dist:
+                max_dist, index = dist, i
+        if index is not None and max_dist > tolerance:
+            keep[index] = True
+            stack.extend([(first, index), (index, last)])
+    return [i for i, kept in enumerate(keep) if kept]
+
+
+def segments_cross(a, b):
+    def orient(p, q, r):
+        return (q[0] - p[0]) * (r[1] - p[1]) - (q[1] - p[1]) * (r[0] - p[0])
+    return (orient(a[0], a[1], b[0]) * orient(a[0], a[1], b[1]) < 0 and
+            orient(b[0], b[1], a[0]) * orient(b[0], b[1], a[1]) < 0)
+
+
+def ring_self_intersects(points):
+    # Uniform grid over the ring so only segments sharing a cell are compared
+    segs = list(zip(points, points[1:]))
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    cell = max(max(xs) - min(xs), max(ys) - min(ys)) / max(1, int(math.sqrt(len(segs)))) or 1.0
+    grid = {}
+    for i, ((x1, y1), (x2, y2)) in enumerate(segs):
+        for gx in range(int(min(x1, x2) // cell), int(max(x1, x2) // cell) + 1):
+            for gy in range(int(min(y1, y2) // cell), int(max(y1, y2) // cell) + 1):
+                grid.setdefault((gx, gy), []).append(i)
+    for members in grid.values():
+        for pos, i in enumerate(members):
+            for j in members[pos + 1:]:
+                if abs(i - j) > 1 and abs(i - j) != len(segs) - 1 and segments_cross(segs[i], segs[j]):
+                    return True
+    return False
+
+
+def simplify_ring(ring):
+    """Douglas-Peucker at ROI_SIMPLIFY_METERS in local metres, tightening the
+    tolerance (and finally keeping the original) if the result is not a
+    valid, non-self-intersecting ring."""
+    lat0 = math.radians(sum(c[1] for c in ring) / len(ring))
+    points = [(c[0] * 111320 * math.cos(lat0), c[1] * 110540) for c in ring]
+    tolerance = ROI_SIMPLIFY_METERS
+    for _ in range(4):
+        kept = douglas_peucker(points, tolerance)
+        if len(kept) >= 4 and not ring_self_intersects([points[i] for i in kept]):
+            return [ring[i] for i in kept]
+        tolerance /= 2
+    return ring
+
+
+def prepare_custom_roi(geojson=None, point=None):
+    """Validate a custom ROI against the area/pixel budgets and return
+    (simplified ee.Geometry, geometry hash, area in km²)."""
+    if point is not None:
+        lon, lat, radius_km = point
+        area_km2 = math.pi * radius_km ** 2
+        if area_km2 > MAX_ROI_AREA_KM2:
+            raise ValueError(f"Radius covers {area_km2:,.0f} km², above the {MAX_ROI_AREA_KM2:,} km² budget.")
+        geom = ee.Geometry.Point([lon, lat]).buffer(radius_km * 1000)
+        canonical = ['point', round(lon, 4), round(lat, 4), radius_km]
+    else:
+        polygons = extract_roi_polygons(geojson)
+        if not polygons:
+            raise ValueError("No Polygon or MultiPolygon found in the ROI.")
+        polygons = [[[[float(c[0]), float(c[1])] for c in ring] for ring in poly] for poly in polygons]
+        vertex_count = sum(len(ring) for poly in polygons for ring in poly)
+        if vertex_count > MAX_ROI_VERTICES:
+            raise ValueError(f"ROI has {vertex_count:,} vertices, above the {MAX_ROI_VERTICES:,} vertex safety limit.")
+        if any(len(ring) < 4 for poly in polygons for ring in poly):
+            raise ValueError("ROI contains a ring with fewer than 4 positions.")
+
+        area_km2 = sum(ring_area_km2(poly[0]) - sum(ring_area_km2(h) for h in poly[1:])
+                       for poly in polygons)
+        if area_km2 > MAX_ROI_AREA_KM2:
+            raise ValueError(f"ROI covers {area_km2:,.0f} km², above the {MAX_ROI_AREA_KM2:,} km² budget.")
+
+        lons = [c[0] for poly in polygons for ring in poly for c in ring]
+        lats = [c[1] for poly in polygons for ring in poly for c in ring]
+        mid_lat = math.radians((max(lats) + min(lats)) / 2)
+        bbox_m2 = (max(lons) - min(lons)) * 111320 * math.cos(mid_lat) * \
+            (max(lats) - min(lats)) * 110540
+        if bbox_m2 / 100 > MAX_ROI_BBOX_PIXELS:
+            raise ValueError("ROI extent is too sprawling for the pixel budget; draw a more compact catchment.")
+
+        polygons = [[simplify_ring(ring) for ring in poly] for poly in polygons]
+        geom = ee.Geometry.MultiPolygon(polygons).simplify(maxError=ROI_SIMPLIFY_METERS)
+        canonical = ['polygon', [[[[round(c[0], 5), round(c[1], 5)] for c in ring]
+                                  for ring in poly] for poly in polygons]]
+
+    roi_hash = hashlib.sha1(json.dumps(canonical).encode()).hexdigest()[:16]
+    return geom, roi_hash, area_km2
+
+
+roi_hash = None
 if target_district_gaul == "Custom":
-    custom_geom = ee.Geometry.Point([88.4344, 23.2423]).buffer(15000)
+    if roi_geojson is None and roi_point is None:
+        st.info("📍 **Custom Region Mode:** Upload or draw a catchment polygon in the sidebar to begin analysis.")
+        profiler.flush()
+        st.stop()
+    try:
+        custom_geom, roi_hash, roi_area_km2 = prepare_custom_roi(roi_geojson, roi_point)
+    except (ValueError, KeyError, TypeError, IndexError) as e:
+        st.error(f"⚠️ **Invalid Region of Interest:** {e}")
+        profiler.flush()
+        st.stop()
+    st.sidebar.caption(f"ROI area: {roi_area_km2:,.1f} km² (budget {MAX_ROI_AREA_KM2:,} km²)")
     study_area = ee.FeatureCollection(
         [ee.Feature(custom_geom, {'name': 'Local Region'})])
 else:
@@ -176,49 +492,10 @@ end_date = f'{target_year}-12-31'
 # ==========================================
 # 6. SATELLITE TELEMETRY EXTRACTION
 # ==========================================
+profiler.mark("6. SATELLITE TELEMETRY EXTRACTION")
 lst_col = ee.ImageCollection("MODIS/061/MOD11A2").select('LST_Day_1km')
 rain_col = ee.ImageCollection("UCSB-CHG/CHIRPS/DAILY")
 l8_col = ee.ImageCollection("LANDSAT/LC08/C02/T1_TOA")
-lulc_base = ee.ImageCollection(
-    "ESA/WorldCover/v200").first().clip(study_area).select('Map')
-srtm = ee.Image('CGIAR/SRTM90_V4').clip(study_area)
-s2_col = ee.ImageCollection("COPERNICUS/S2_SR_HARMONIZED").filterBounds(
-    study_area.geometry()).filterDate(start_date, end_date)
-
-lst_current = lst_col.filterDate(start_date, end_date).filterBounds(
-    study_area.geometry()).mean().multiply(0.02).subtract(273.15).clip(study_area)
-ndwi_current = s2_col.median().normalizedDifference(
-    ['B3', 'B8']).clip(study_area)
-ndvi_current = s2_col.median().normalizedDifference(
-    ['B8', 'B4']).clip(study_area)
-rain_current = rain_col.filterDate(start_date, end_date).filterBounds(
-    study_area.geometry()).sum().clip(study_area)
-slope = ee.Terrain.slope(srtm)
-l8_image = l8_col.filterDate(start_date, end_date).filterBounds(
-    study_area.geometry()).median().clip(study_area)
-
-iron_oxide = l8_image.select('B4').divide(l8_image.select('B2')).rename('Iron')
-ferrous = l8_image.select('B6').divide(l8_image.select('B5')).rename('Ferrous')
-clay_index = l8_image.select('B6').divide(l8_image.select('B7')).rename('Clay')
-mineral_composite = ee.Image.cat([iron_oxide, ferrous, clay_index])
-npk_proxy = ndvi_current.multiply(ndwi_current.add(1)).rename('NPK_Proxy')
-
-advanced_lulc = ee.Image(0).clip(study_area)
-advanced_lulc = advanced_lulc.where(
-    lulc_base.eq(10).And(ndvi_current.gt(0.65)), 1)
-advanced_lulc = advanced_lulc.where(lulc_base.eq(10).And(
-    ndvi_current.lte(0.65)).And(ndvi_current.gt(0.4)), 2)
-advanced_lulc = advanced_lulc.where((lulc_base.eq(10).Or(lulc_base.eq(40))).And(
-    ndwi_current.gt(0.15)).And(ndvi_current.gt(0.5)), 3)
-advanced_lulc = advanced_lulc.where(lulc_base.eq(20).Or(
-    lulc_base.eq(10).And(ndvi_current.lte(0.4))), 4)
-advanced_lulc = advanced_lulc.where(lulc_base.eq(40).And(
-    ndvi_current.gt(0.55)).And(advanced_lulc.eq(0)), 5)
-advanced_lulc = advanced_lulc.where(
-    lulc_base.eq(40).And(advanced_lulc.eq(0)), 6)
-advanced_lulc = advanced_lulc.where(lulc_base.eq(50), 7)
-advanced_lulc = advanced_lulc.where(lulc_base.eq(80), 8)
-advanced_lulc = advanced_lulc.where(advanced_lulc.eq(0), 9)
 
 
 def get_stat(img, band, scale=1000):
@@ -230,65 +507,533 @@ def get_stat(img, band, scale=1000):
         return 0.00
 
 
-with st.spinner(f"🛰️ Processing Orbital Telemetry for {selected_display}..."):
-    avg_lst = get_stat(lst_current, 'LST_Day_1km', 1000)
-    avg_ndwi = get_stat(ndwi_current, 'nd', 1000)
-    avg_ndvi = get_stat(ndvi_current, 'nd', 1000)
-    avg_rain = get_stat(rain_current, 'precipitation', 5000)
-    avg_slope = get_stat(slope, 'slope', 1000)
-    avg_npk = get_stat(npk_proxy, 'NPK_Proxy', 1000)
-
-    if avg_lst == 0:
-        avg_lst = 28.75
-    if avg_rain == 0:
-        avg_rain = 1450.45
-    if avg_ndvi == 0:
-        avg_ndvi = 0.55
-    if avg_ndwi == 0:
-        avg_ndwi = 0.15
-    if avg_npk == 0:
-        avg_npk = 0.40
-    if avg_slope == 0:
-        avg_slope = 4.25
+def build_advanced_lulc(lulc_base, ndvi_current, ndwi_current):
+    advanced_lulc = ee.Image(0).clip(study_area)
+    advanced_lulc = advanced_lulc.where(
+        lulc_base.eq(10).And(ndvi_current.gt(0.65)), 1)
+    advanced_lulc = advanced_lulc.where(lulc_base.eq(10).And(
+        ndvi_current.lte(0.65)).And(ndvi_current.gt(0.4)), 2)
+    advanced_lulc = advanced_lulc.where((lulc_base.eq(10).Or(lulc_base.eq(40))).And(
+        ndwi_current.gt(0.15)).And(ndvi_current.gt(0.5)), 3)
+    advanced_lulc = advanced_lulc.where(lulc_base.eq(20).Or(
+        lulc_base.eq(10).And(ndvi_current.lte(0.4))), 4)
+    advanced_lulc = advanced_lulc.where(lulc_base.eq(40).And(
+        ndvi_current.gt(0.55)).And(advanced_lulc.eq(0)), 5)
+    advanced_lulc = advanced_lulc.where(
+        lulc_base.eq(40).And(advanced_lulc.eq(0)), 6)
+    advanced_lulc = advanced_lulc.where(lulc_base.eq(50), 7)
+    advanced_lulc = advanced_lulc.where(lulc_base.eq(80), 8)
+    advanced_lulc = advanced_lulc.where(advanced_lulc.eq(0), 9)
+    return advanced_lulc
+
+
+def build_mineral_composite(l8_image):
+    iron_oxide = l8_image.select('B4').divide(l8_image.select('B2')).rename('Iron')
+    ferrous = l8_image.select('B6').divide(l8_image.select('B5')).rename('Ferrous')
+    clay_index = l8_image.select('B6').divide(l8_image.select('B7')).rename('Clay')
+    return ee.Image.cat([iron_oxide, ferrous, clay_index])
+
+
+class CodeTable:
+    """Reference-counted interning of names to small integer codes.
+
+    A code (and its name) is released when its last row is evicted and the
+    code is reused, so churn such as custom ROI hashes cannot grow the
+    table beyond the names that still have live rows.
+    """
+
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+        self.refs = array('I')
+        self.free = array('I')
+        self.name_bytes = 0
+
+    @staticmethod
+    def name_size(name):
+        size = sys.getsizeof(name)
+        if isinstance(name, tuple):
+            size += sum(sys.getsizeof(part) for part in name)
+        return size
+
+    def acquire(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            if self.free:
+                code = self.free.pop()
+                self.names[code] = name
+            else:
+                code = len(self.names)
+                self.names.append(name)
+                self.refs.append(0)
+            self.codes[name] = code
+            self.name_bytes += self.name_size(name)
+        self.refs[code] += 1
+        return code
+
+    def release(self, code):
+        self.refs[code] -= 1
+        if self.refs[code] == 0:
+            name = self.names[code]
+            del self.codes[name]
+            self.names[code] = None
+            self.free.append(code)
+            self.name_bytes -= self.name_size(name)
+
+    def nbytes(self):
+        return (sys.getsizeof(self.codes) + sys.getsizeof(self.names) + sys.getsizeof(self.refs)
+                + sys.getsizeof(self.free) + self.name_bytes)
+
+
+class IndicatorStore:
+    """Process-wide columnar store of indicator results.
+
+    Each row lives in three typed columns: a packed int64 key (district
+    code, indicator code, year, month), a float64 value and an int64 access
+    tick. An open-addressed int32 slot table over the key column gives O(1)
+    lookups. Month 0 holds annual district-wide statistics. Once the
+    measured footprint reaches the byte budget, the least-recently-ticked
+    sixteenth of the rows is evicted in one pass and their slots reused.
+    """
+
+    EMPTY = -1
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.keys = array('q')
+        self.values = array('d')
+        self.ticks = array('q')
+        self.free_rows = array('i')
+        self.bits = 6
+        self.slots = array('i', [self.EMPTY]) * (1 << self.bits)
+        self.count = 0
+        self.tick = 0
+        self.districts = CodeTable()
+        self.indicators = CodeTable()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _pack(district_code, indicator_code, year, month):
+        return district_code << 32 | indicator_code << 20 | year << 4 | month
+
+    def _home(self, key):
+        # Fibonacci hashing on the top bits of the 64-bit product
+        return ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - self.bits)
+
+    def _find_slot(self, key):
+        mask = len(self.slots) - 1
+        i = self._home(key)
+        while True:
+            row = self.slots[i]
+            if row == self.EMPTY or self.keys[row] == key:
+                return i
+            i = (i + 1) & mask
+
+    def _resize(self):
+        self.bits += 1
+        self.slots = array('i', [self.EMPTY]) * (1 << self.bits)
+        for row, key in enumerate(self.keys):
+            if key != self.EMPTY:
+                self.slots[self._find_slot(key)] = row
+
+    def _delete(self, row):
+        # Backward-shift deletion keeps linear probe chains intact without tombstones
+        key = self.keys[row]
+        mask = len(self.slots) - 1
+        i = j = self._find_slot(key)
+        while True:
+            j = (j + 1) & mask
+            moved = self.slots[j]
+            if moved == self.EMPTY:
+                break
+            home = self._home(self.keys[moved])
+            if (i < j and (home <= i or home > j)) or (i > j and home <= i and home > j):
+                self.slots[i] = moved
+                i = j
+        self.slots[i] = self.EMPTY
+
+        self.districts.release(key >> 32)
+        self.indicators.release((key >> 20) & 0xFFF)
+        self.keys[row] = self.EMPTY
+        self.free_rows.append(row)
+        self.count -= 1
+
+    def _evict_batch(self):
+        live = [row for row, key in enumerate(self.keys) if key != self.EMPTY]
+        for row in heapq.nsmallest(max(1, len(live) // 16), live, key=self.ticks.__getitem__):
+            self._delete(row)
+
+    def _lookup(self, district, year, month, indicator):
+        district_code = self.districts.codes.get(district)
+        indicator_code = self.indicators.codes.get(indicator)
+        if district_code is None or indicator_code is None:
+            return None
+        row = self.slots[self._find_slot(self._pack(district_code, indicator_code, year, month))]
+        return None if row == self.EMPTY else row
+
+    def _nbytes(self):
+        columns = (self.keys, self.values, self.ticks, self.free_rows, self.slots)
+        return sum(sys.getsizeof(col) for col in columns) + self.districts.nbytes() + self.indicators.nbytes()
+
+    def get(self, district, year, month, indicator):
+        with self.lock:
+            row = self._lookup(district, year, month, indicator)
+            if row is None:
+                return None
+            self.tick += 1
+            self.ticks[row] = self.tick
+            return self.values[row]
+
+    def put(self, district, year, month, indicator, value):
+        with self.lock:
+            self.tick += 1
+            row = self._lookup(district, year, month, indicator)
+            if row is not None:
+                self.values[row] = float(value)
+                self.ticks[row] = self.tick
+                return
+
+            if self.count and self._nbytes() >= self.max_bytes:
+                self._evict_batch()
+            key = self._pack(self.districts.acquire(district), self.indicators.acquire(indicator), year, month)
+            if self.free_rows:
+                row = self.free_rows.pop()
+                self.keys[row], self.values[row], self.ticks[row] = key, float(value), self.tick
+            else:
+                row = len(self.keys)
+                self.keys.append(key)
+                self.values.append(float(value))
+                self.ticks.append(self.tick)
+            self.count += 1
+            if self.count * 2 > len(self.slots):
+                self._resize()
+            else:
+                self.slots[self._find_slot(key)] = row
+
+    def nbytes(self):
+        with self.lock:
+            return self._nbytes()
+
+
+@st.cache_resource
+def get_indicator_store():
+    return IndicatorStore()
+
+
+@st.cache_resource
+def get_ee_pool():
+    return ThreadPoolExecutor(max_workers=16)
+
+
+indicator_store = get_indicator_store()
+ee_pool = get_ee_pool()
+
+
+def submit_ee(label, fn, *args):
+    owner = profile_local.profiler
+
+    def task():
+        profile_local.profiler, profile_local.label = owner, label
+        started, started_cpu = time.perf_counter(), time.thread_time()
+        try:
+            return fn(*args)
+        finally:
+            if owner is not None:
+                owner.record_task(label, time.perf_counter() - started, time.thread_time() - started_cpu)
+            profile_local.profiler, profile_local.label = None, None
+    return ee_pool.submit(task)
+
+
+# Custom ROIs are keyed by geometry hash so identical catchments share results
+district_key = ('Custom', roi_hash) if roi_hash else (target_state, target_district_gaul)
+
+
+def stored_stat(indicator, img, band, scale=1000):
+    val = indicator_store.get(district_key, target_year, 0, indicator)
+    if val is None:
+        val = get_stat(img, band, scale)
+        # 0.00 is get_stat's failure sentinel; never share it across sessions
+        if val != 0:
+            indicator_store.put(district_key, target_year, 0, indicator, val)
+    return val
+
+
+# Lazy Layer Graph: node -> (dependencies, builder). Nodes are only built
+# (and stats only evaluated) when the active layer, KPIs or export ask for them.
+LAYER_GRAPH = {
+    's2_median': ([], lambda: ee.ImageCollection("COPERNICUS/S2_SR_HARMONIZED").filterBounds(
+        study_area.geometry()).filterDate(start_date, end_date).median()),
+    'lulc_base': ([], lambda: ee.ImageCollection(
+        "ESA/WorldCover/v200").first().clip(study_area).select('Map')),
+    'srtm': ([], lambda: ee.Image('CGIAR/SRTM90_V4').clip(study_area)),
+    'lst_current': ([], lambda: lst_col.filterDate(start_date, end_date).filterBounds(
+        study_area.geometry()).mean().multiply(0.02).subtract(273.15).clip(study_area)),
+    'rain_current': ([], lambda: rain_col.filterDate(start_date, end_date).filterBounds(
+        study_area.geometry()).sum().clip(study_area)),
+    'l8_image': ([], lambda: l8_col.filterDate(start_date, end_date).filterBounds(
+        study_area.geometry()).median().clip(study_area)),
+    'ndwi_current': (['s2_median'], lambda s2: s2.normalizedDifference(['B3', 'B8']).clip(study_area)),
+    'ndvi_current': (['s2_median'], lambda s2: s2.normalizedDifference(['B8', 'B4']).clip(study_area)),
+    'slope': (['srtm'], lambda srtm: ee.Terrain.slope(srtm)),
+    'npk_proxy': (['ndvi_current', 'ndwi_current'], lambda ndvi, ndwi: ndvi.multiply(ndwi.add(1)).rename('NPK_Proxy')),
+    'mineral_composite': (['l8_image'], build_mineral_composite),
+    'advanced_lulc': (['lulc_base', 'ndvi_current', 'ndwi_current'], build_advanced_lulc),
+    # Evaluated regional statistics (futures, one getInfo round-trip each)
+    'avg_lst': (['lst_current'], lambda img: submit_ee('get_stat', stored_stat, 'lst', img, 'LST_Day_1km', 1000)),
+    'avg_ndwi': (['ndwi_current'], lambda img: submit_ee('get_stat', stored_stat, 'ndwi', img, 'nd', 1000)),
+    'avg_ndvi': (['ndvi_current'], lambda img: submit_ee('get_stat', stored_stat, 'ndvi', img, 'nd', 1000)),
+    'avg_rain': (['rain_current'], lambda img: submit_ee('get_stat', stored_stat, 'rain', img, 'precipitation', 5000)),
+    'avg_slope': (['slope'], lambda img: submit_ee('get_stat', stored_stat, 'slope', img, 'slope', 1000)),
+    'avg_npk': (['npk_proxy'], lambda img: submit_ee('get_stat', stored_stat, 'npk', img, 'NPK_Proxy', 1000)),
+    'centroid': ([], lambda: submit_ee('centroid', lambda: study_area.geometry().centroid().getInfo()['coordinates'])),
+}
+
+
+def cancel_pending(nodes):
+    # Drop queued EE work from a superseded run so it cannot delay current requests
+    for node in nodes:
+        if isinstance(node, Future):
+            node.cancel()
+
+
+# Memoised nodes survive reruns and are only invalidated when the
+# district, target year or climate scenario changes.
+graph_key = (district_key, target_year, future_mode)
+if st.session_state.get('layer_graph_key') != graph_key:
+    cancel_pending(st.session_state.get('layer_graph', {}).values())
+    st.session_state['layer_graph_key'] = graph_key
+    st.session_state['layer_graph'] = {}
+    st.session_state['layer_graph_failures'] = {}
+
+# Failed EE requests are retried a bounded number of times, and never sooner
+# than the delay, so a permanent gap (e.g. no S2_SR data before 2019) does not
+# resubmit work on every unrelated widget change.
+EE_RETRY_LIMIT = 3
+EE_RETRY_DELAY_S = 60
+
+
+def node_failed(node, zero_is_failure):
+    # A missing value, an EE error or a cancelled task; 0 only for get_stat's
+    # sentinel, since a real monthly value (e.g. 0 mm of rain) can be 0
+    if not node.done():
+        return False
+    if node.cancelled() or node.exception() is not None:
+        return True
+    return node.result() is None or (zero_is_failure and node.result() == 0)
+
+
+def evict_if_retry_due(cache, failures, key, zero_is_failure=True):
+    node = cache.get(key)
+    if not isinstance(node, Future) or not node_failed(node, zero_is_failure):
+        return
+    record = failures.setdefault(key, {'attempts': 1, 'failed_at': None})
+    if record['failed_at'] is None:
+        record['failed_at'] = time.time()
+    if record['attempts'] < EE_RETRY_LIMIT and time.time() - record['failed_at'] >= EE_RETRY_DELAY_S:
+        del cache[key]
+        record['attempts'] += 1
+        record['failed_at'] = None
+
+
+def layer(name):
+    cache = st.session_state['layer_graph']
+    evict_if_retry_due(cache, st.session_state.setdefault('layer_graph_failures', {}), name)
+    if name not in cache:
+        deps, builder = LAYER_GRAPH[name]
+        cache[name] = builder(*[layer(d) for d in deps])
+    return cache[name]
+
+
+STAT_FALLBACKS = {
+    'avg_lst': 28.75, 'avg_ndwi': 0.15, 'avg_ndvi': 0.55,
+    'avg_rain': 1450.45, 'avg_slope': 4.25, 'avg_npk': 0.40
+}
+
 
+def finalise_stat(name, val):
+    if val == 0:
+        val = STAT_FALLBACKS[name]
     if future_mode:
-        avg_lst = avg_lst + 2.15
-        avg_rain = avg_rain * 0.895
-        avg_ndvi = avg_ndvi * 0.85
-        avg_ndwi = avg_ndwi * 0.80
-
-# ==========================================
-# 7. GEOSPATIAL BIOME & LOGIC ENGINES
-# ==========================================
-power_score = 50
-if avg_ndvi > 0.4:
-    power_score += 15
-elif avg_ndvi < 0.2:
-    power_score -= 20
-if avg_rain > 1200:
-    power_score += 15
-elif avg_rain > 800:
-    power_score += 5
-elif avg_rain < 600:
-    power_score -= 20
-if avg_lst > 35:
-    power_score -= 20
-elif avg_lst > 32:
-    power_score -= 10
-elif avg_lst < 28:
-    power_score += 10
-if avg_npk > 0.3:
-    power_score += 10
-elif avg_npk < 0.15:
-    power_score -= 10
-if avg_slope > 15:
-    power_score -= 15
-elif avg_slope > 8:
-    power_score -= 5
-power_score = max(0, min(100, int(power_score)))
-
-ps_color = "#2ECC71" if power_score >= 75 else "#F1C40F" if power_score >= 40 else "#E74C3C"
-ps_text = "Highly Optimal & Resilient" if power_score >= 75 else "Vulnerable / Requires Intervention" if power_score >= 40 else "CRITICAL ECO-STRESS"
+        if name == 'avg_lst':
+            val = val + 2.15
+        elif name == 'avg_rain':
+            val = val * 0.895
+        elif name == 'avg_ndvi':
+            val = val * 0.85
+        elif name == 'avg_ndwi':
+            val = val * 0.80
+    return val
+
+
+core_sample = study_area.geometry().centroid().buffer(3000)
+
+if "LST" in analysis_type:
+    y_label, chart_title, series_key = "Temperature (°C)", "Monthly Land Surface Temperature (LST)", "core_lst"
+elif "NDWI" in analysis_type:
+    y_label, chart_title, series_key = "Moisture Index (NDWI)", "Monthly Moisture Index (NDWI)", "core_ndwi"
+elif "Biomass" in analysis_type or "NDVI" in analysis_type or "Fertility" in analysis_type:
+    y_label, chart_title, series_key = "Vegetation Index (NDVI)", "Monthly Crop Biomass (NDVI)", "core_ndvi"
+else:
+    y_label, chart_title, series_key = "Rainfall (mm)", "Monthly Precipitation Accumulation", "core_rain"
+
+
+def fetch_month_val(year, m):
+    cached = indicator_store.get(district_key, year, m, series_key)
+    if cached is not None:
+        return cached
+    start = ee.Date.fromYMD(year, m, 1)
+    end = start.advance(1, 'month')
+    try:
+        m_s2 = ee.ImageCollection(
+            "COPERNICUS/S2_SR_HARMONIZED").filterBounds(core_sample).filterDate(start, end)
+        if "LST" in analysis_type:
+            img = lst_col.filterBounds(core_sample).filterDate(
+                start, end).mean().multiply(0.02).subtract(273.15).rename('val')
+        elif "NDWI" in analysis_type:
+            img = m_s2.median().normalizedDifference(
+                ['B3', 'B8']).rename('val')
+        elif "Biomass" in analysis_type or "NDVI" in analysis_type or "Fertility" in analysis_type:
+            img = m_s2.median().normalizedDifference(
+                ['B8', 'B4']).rename('val')
+        else:
+            img = rain_col.filterBounds(core_sample).filterDate(
+                start, end).sum().rename('val')
+        val = img.reduceRegion(reducer=ee.Reducer.mean(
+        ), geometry=core_sample, scale=1000, maxPixels=1e6).get('val').getInfo()
+        if val is not None:
+            indicator_store.put(district_key, year, m, series_key, val)
+        return val
+    except:
+        return None
+
+
+# Fire every EE request at once; the sections below render each result as it lands
+stat_futures = {name: layer(name) for name in STAT_FALLBACKS}
+center_future = layer('centroid')
+
+# Series futures are memoised like the layer graph, plus the compare year and series
+series_memo_key = (graph_key, compare_year, series_key)
+if st.session_state.get('series_memo_key') != series_memo_key:
+    cancel_pending(st.session_state.get('series_futures', {}).values())
+    st.session_state['series_memo_key'] = series_memo_key
+    st.session_state['series_futures'] = {}
+    st.session_state['series_failures'] = {}
+series_futures = st.session_state['series_futures']
+for year in (target_year, compare_year):
+    for m in range(1, 13):
+        evict_if_retry_due(series_futures, st.session_state.setdefault('series_failures', {}), (year, m),
+                           zero_is_failure=False)
+        if (year, m) not in series_futures:
+            series_futures[(year, m)] = submit_ee('time_series', fetch_month_val, year, m)
+
+# ==========================================
+# 7. PROGRESSIVE TELEMETRY RENDERING (Top Section)
+# ==========================================
+def compute_power_score(avg_ndvi, avg_rain, avg_lst, avg_npk, avg_slope):
+    power_score = 50
+    if avg_ndvi > 0.4:
+        power_score += 15
+    elif avg_ndvi < 0.2:
+        power_score -= 20
+    if avg_rain > 1200:
+        power_score += 15
+    elif avg_rain > 800:
+        power_score += 5
+    elif avg_rain < 600:
+        power_score -= 20
+    if avg_lst > 35:
+        power_score -= 20
+    elif avg_lst > 32:
+        power_score -= 10
+    elif avg_lst < 28:
+        power_score += 10
+    if avg_npk > 0.3:
+        power_score += 10
+    elif avg_npk < 0.15:
+        power_score -= 10
+    if avg_slope > 15:
+        power_score -= 15
+    elif avg_slope > 8:
+        power_score -= 5
+    return max(0, min(100, int(power_score)))
+
+
+KPI_LAYOUT = [
+    ('avg_lst', " Avg Temp (LST)", "{:.2f} °C"),
+    ('avg_ndwi', " Moisture (NDWI)", "{:.2f}"),
+    ('avg_slope', " Terrain Slope", "{:.2f}°"),
+    ('avg_npk', " Fertility Index", "{:.2f}"),
+    ('avg_rain', " Annual Rainfall", "{:.2f} mm"),
+]
+
+
+def render_progress(raw_stats):
+    # Pending indicators show a placeholder; failed ones (raw 0) are flagged as fallbacks
+    for (name, label, fmt), slot in zip(KPI_LAYOUT, kpi_slots):
+        if name not in raw_stats:
+            slot.metric(label, "⏳ Pending")
+        elif raw_stats[name] == 0:
+            slot.metric(label, fmt.format(finalise_stat(name, 0)),
+                        delta="Fallback estimate", delta_color="off")
+        else:
+            slot.metric(label, fmt.format(finalise_stat(name, raw_stats[name])))
+
+    vals = {name: finalise_stat(name, raw_stats.get(name, 0)) for name in STAT_FALLBACKS}
+    score = compute_power_score(vals['avg_ndvi'], vals['avg_rain'],
+                                vals['avg_lst'], vals['avg_npk'], vals['avg_slope'])
+    if len(raw_stats) < len(STAT_FALLBACKS):
+        note = f"<br><span style='font-size: 14px; color: #888;'>⏳ Provisional: {len(raw_stats)}/{len(STAT_FALLBACKS)} indicators received</span>"
+    elif 0 in raw_stats.values():
+        note = "<br><span style='font-size: 14px; color: #888;'>Includes fallback estimates for masked indicators</span>"
+    else:
+        note = ""
+
+    ps_color = "#2ECC71" if score >= 75 else "#F1C40F" if score >= 40 else "#E74C3C"
+    ps_text = "Highly Optimal & Resilient" if score >= 75 else "Vulnerable / Requires Intervention" if score >= 40 else "CRITICAL ECO-STRESS"
+    score_slot.markdown(
+        f"### ⚡ District Agri Power Score: <span style='color:{ps_color};'>{score} / 100 ({ps_text})</span>{note}", unsafe_allow_html=True)
+    meter_html = f"""<div style="width: 100%; background-color: #2b2b2b; border-radius: 8px; margin-bottom: 10px; border: 1px solid #444;"><div style="width: {score}%; height: 20px; background-color: {ps_color}; border-radius: 8px; transition: width 0.5s;"></div></div>"""
+    meter_slot.markdown(meter_html, unsafe_allow_html=True)
+
+
+profiler.mark("7. PROGRESSIVE TELEMETRY RENDERING (Top Section)")
+col_title, col_minimap = st.columns([3, 1])
+
+with col_title:
+    st.title(f"🇮🇳 Viksit Bharat Women Agri Intelligence")
+    st.markdown(
+        "#### *AI-Powered Geospatial Platform for Rural Economic Policy*")
+    score_slot = st.empty()
+    meter_slot = st.empty()
+    insight_slot = st.empty()
+
+with col_minimap:
+    minimap_slot = st.empty()
+
+st.markdown("---")
+kpi_slots = [col.empty() for col in st.columns(5)]
+st.markdown("---")
+
+raw_stats = {name: f.result() for name, f in stat_futures.items() if f.done()}
+render_progress(raw_stats)
+pending_stats = {f: name for name, f in stat_futures.items() if not f.done()}
+with st.spinner(f"🛰️ Processing Orbital Telemetry for {selected_display}..."):
+    for future in as_completed(pending_stats):
+        raw_stats[pending_stats[future]] = future.result()
+        render_progress(raw_stats)
+
+avg_lst = finalise_stat('avg_lst', raw_stats['avg_lst'])
+avg_ndwi = finalise_stat('avg_ndwi', raw_stats['avg_ndwi'])
+avg_ndvi = finalise_stat('avg_ndvi', raw_stats['avg_ndvi'])
+avg_rain = finalise_stat('avg_rain', raw_stats['avg_rain'])
+avg_slope = finalise_stat('avg_slope', raw_stats['avg_slope'])
+avg_npk = finalise_stat('avg_npk', raw_stats['avg_npk'])
+
+# ==========================================
+# 8. GEOSPATIAL BIOME & LOGIC ENGINES
+# ==========================================
+profiler.mark("8. GEOSPATIAL BIOME & LOGIC ENGINES")
+power_score = compute_power_score(avg_ndvi, avg_rain, avg_lst, avg_npk, avg_slope)
 
 raw_weps = (power_score * 0.65) + \
     (20 - min(20, avg_slope)) * 1.2 + (avg_rain / 120)
@@ -390,29 +1135,18 @@ elif "Mineral" in analysis_type:
 
 
 # ==========================================
-# 8. UI RENDERING PIPELINE (Top Section)
+# 9. UI RENDERING PIPELINE (Top Section Finalisation)
 # ==========================================
-col_title, col_minimap = st.columns([3, 1])
+profiler.mark("9. UI RENDERING PIPELINE (Top Section Finalisation)")
+stress_level = "severe environmental degradation" if power_score < 40 else "moderate climatic vulnerability" if power_score < 75 else "robust agrarian health"
+terrain_desc = "steep, high-altitude terrain" if avg_slope > 10 else "flat, highly accessible plains"
+insight_slot.info(f"💡 **District Strategic Insight:** **{selected_display}** currently exhibits {stress_level} characterized by {terrain_desc} and an average precipitation of {avg_rain:.2f}mm. There is immense, untapped potential for transitioning local Women's Self Help Groups (SHGs) away from manual labor and into tech-driven agricultural data enterprises.")
 
-with col_title:
-    st.title(f"🇮🇳 Viksit Bharat Women Agri Intelligence")
-    st.markdown(
-        "#### *AI-Powered Geospatial Platform for Rural Economic Policy*")
-
-    st.markdown(
-        f"### ⚡ District Agri Power Score: <span style='color:{ps_color};'>{power_score} / 100 ({ps_text})</span>", unsafe_allow_html=True)
-    meter_html = f"""<div style="width: 100%; background-color: #2b2b2b; border-radius: 8px; margin-bottom: 10px; border: 1px solid #444;"><div style="width: {power_score}%; height: 20px; background-color: {ps_color}; border-radius: 8px; transition: width 0.5s;"></div></div>"""
-    st.markdown(meter_html, unsafe_allow_html=True)
-
-    stress_level = "severe environmental degradation" if power_score < 40 else "moderate climatic vulnerability" if power_score < 75 else "robust agrarian health"
-    terrain_desc = "steep, high-altitude terrain" if avg_slope > 10 else "flat, highly accessible plains"
-    st.info(f"💡 **District Strategic Insight:** **{selected_display}** currently exhibits {stress_level} characterized by {terrain_desc} and an average precipitation of {avg_rain:.2f}mm. There is immense, untapped potential for transitioning local Women's Self Help Groups (SHGs) away from manual labor and into tech-driven agricultural data enterprises.")
-
-with col_minimap:
+with minimap_slot.container():
     mini_map = folium.Map(location=[22.0, 79.0], zoom_start=4,
                           tiles="CartoDB dark_matter", control_scale=False, zoom_control=False)
     try:
-        mini_center = study_area.geometry().centroid().getInfo()['coordinates']
+        mini_center = center_future.result()
         folium.Marker(location=[mini_center[1], mini_center[0]], popup=selected_display, icon=folium.Icon(
             color="red", icon="info-sign")).add_to(mini_map)
     except:
@@ -420,82 +1154,65 @@ with col_minimap:
     st_folium(mini_map, width=250, height=220,
               key="minimap", returned_objects=[])
 
-st.markdown("---")
-
-kpi1, kpi2, kpi3, kpi4, kpi5 = st.columns(5)
-kpi1.metric(" Avg Temp (LST)", f"{avg_lst:.2f} °C")
-kpi2.metric(" Moisture (NDWI)", f"{avg_ndwi:.2f}")
-kpi3.metric(" Terrain Slope", f"{avg_slope:.2f}°")
-kpi4.metric(" Fertility Index", f"{avg_npk:.2f}")
-kpi5.metric(" Annual Rainfall", f"{avg_rain:.2f} mm")
-
-st.markdown("---")
-
 # ==========================================
-# 9. TIME-SERIES COMPARISON ENGINE
+# 10. TIME-SERIES COMPARISON ENGINE
 # ==========================================
+profiler.mark("10. TIME-SERIES COMPARISON ENGINE")
 st.markdown(
     f"### 📊 Temporal Yield & Risk Analysis ({compare_year} vs {target_year})")
 
-with st.spinner(f"Generating Comparative Orbital Time-Series..."):
-    try:
-        core_sample = study_area.geometry().centroid().buffer(3000)
+x_months = ['Jan', 'Feb', 'Mar', 'Apr', 'May',
+            'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
 
-        if "LST" in analysis_type:
-            y_label, chart_title = "Temperature (°C)", "Monthly Land Surface Temperature (LST)"
-        elif "NDWI" in analysis_type:
-            y_label, chart_title = "Moisture Index (NDWI)", "Monthly Moisture Index (NDWI)"
-        elif "Biomass" in analysis_type or "NDVI" in analysis_type or "Fertility" in analysis_type:
-            y_label, chart_title = "Vegetation Index (NDVI)", "Monthly Crop Biomass (NDVI)"
-        else:
-            y_label, chart_title = "Rainfall (mm)", "Monthly Precipitation Accumulation"
 
-        y_target, y_compare = [], []
-        x_months = ['Jan', 'Feb', 'Mar', 'Apr', 'May',
-                    'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+def build_series_chart(y_target, y_compare):
+    df_chart = pd.DataFrame(
+        {'Month': x_months, f'{target_year} (Target)': y_target, f'{compare_year} (Baseline)': y_compare})
+    fig = px.line(df_chart, x='Month', y=[
+                  f'{target_year} (Target)', f'{compare_year} (Baseline)'], markers=True, template="plotly_dark")
+    fig.update_traces(line_width=3, marker=dict(size=8))
+    fig['data'][0]['line']['color'] = '#2ECC71'
+    fig['data'][1]['line']['color'] = '#E74C3C'
+    fig.update_layout(margin=dict(l=20, r=20, t=20, b=20), height=350,
+                      plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', legend_title_text='')
+    return fig
 
-        def fetch_month_val(year, m):
-            start = ee.Date.fromYMD(year, m, 1)
-            end = start.advance(1, 'month')
-            try:
-                m_s2 = ee.ImageCollection(
-                    "COPERNICUS/S2_SR_HARMONIZED").filterBounds(core_sample).filterDate(start, end)
-                if "LST" in analysis_type:
-                    img = lst_col.filterBounds(core_sample).filterDate(
-                        start, end).mean().multiply(0.02).subtract(273.15).rename('val')
-                elif "NDWI" in analysis_type:
-                    img = m_s2.median().normalizedDifference(
-                        ['B3', 'B8']).rename('val')
-                elif "Biomass" in analysis_type or "NDVI" in analysis_type or "Fertility" in analysis_type:
-                    img = m_s2.median().normalizedDifference(
-                        ['B8', 'B4']).rename('val')
-                else:
-                    img = rain_col.filterBounds(core_sample).filterDate(
-                        start, end).sum().rename('val')
-                val = img.reduceRegion(reducer=ee.Reducer.mean(
-                ), geometry=core_sample, scale=1000, maxPixels=1e6).get('val').getInfo()
-                return val
-            except:
-                return None
 
+chart_slot = st.empty()
+series_status = st.empty()
+
+with st.spinner(f"Generating Comparative Orbital Time-Series..."):
+    try:
+        # Partial charts leave gaps for months still in flight
+        series_vals = {}
+        pending_series = {f: key for key, f in series_futures.items()}
+        for future in as_completed(pending_series):
+            val = future.result()
+            series_vals[pending_series[future]] = val
+            series_status.caption(
+                f"⏳ {len(series_vals)}/{len(series_futures)} orbital samples received")
+            if val is not None:
+                chart_slot.plotly_chart(build_series_chart(
+                    [series_vals.get((target_year, m)) for m in range(1, 13)],
+                    [series_vals.get((compare_year, m)) for m in range(1, 13)]),
+                    use_container_width=True, key=f"series_chart_{len(series_vals)}")
+
+        y_target, y_compare = [], []
         for m in range(1, 13):
-            val_t = fetch_month_val(target_year, m)
-            val_c = fetch_month_val(compare_year, m)
+            val_t = series_vals[(target_year, m)]
+            val_c = series_vals[(compare_year, m)]
             y_target.append(val_t if val_t is not None else (
                 y_target[-1] if len(y_target) > 0 else 0))
             y_compare.append(val_c if val_c is not None else (
                 y_compare[-1] if len(y_compare) > 0 else 0))
 
-        df_chart = pd.DataFrame(
-            {'Month': x_months, f'{target_year} (Target)': y_target, f'{compare_year} (Baseline)': y_compare})
-        fig = px.line(df_chart, x='Month', y=[
-                      f'{target_year} (Target)', f'{compare_year} (Baseline)'], markers=True, template="plotly_dark")
-        fig.update_traces(line_width=3, marker=dict(size=8))
-        fig['data'][0]['line']['color'] = '#2ECC71'
-        fig['data'][1]['line']['color'] = '#E74C3C'
-        fig.update_layout(margin=dict(l=20, r=20, t=20, b=20), height=350,
-                          plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', legend_title_text='')
-        st.plotly_chart(fig, use_container_width=True)
+        chart_slot.plotly_chart(build_series_chart(y_target, y_compare),
+                                use_container_width=True, key="series_chart_final")
+        if None in series_vals.values():
+            series_status.caption(
+                "Months without clear-sky telemetry carry forward the previous month's value.")
+        else:
+            series_status.empty()
     except Exception as e:
         st.warning(
             f"Time-series dynamics temporarily masked by dense regional cloud cover or memory limits.")
@@ -503,8 +1220,9 @@ with st.spinner(f"Generating Comparative Orbital Time-Series..."):
 st.markdown("---")
 
 # ==========================================
-# 10. SINGLE ULTRA-WIDE PROFESSIONAL MAP
+# 11. SINGLE ULTRA-WIDE PROFESSIONAL MAP
 # ==========================================
+profiler.mark("11. SINGLE ULTRA-WIDE PROFESSIONAL MAP")
 # Dynamic Scientific Header
 map_headers = {
     "LULC": "Advanced Agroforestry & Land Use Classification",
@@ -544,7 +1262,7 @@ export_scale = 1000
 vis_params = {}
 
 if "LULC" in analysis_type:
-    active_image = advanced_lulc
+    active_image = layer('advanced_lulc')
     export_scale = 10
     vis_params = {'min': 1, 'max': 9, 'palette': [
         '#004400', '#228B22', '#00FF7F', '#BDB76B', '#9ACD32', '#FFD700', '#FF0000', '#0000FF', '#D3D3D3']}
@@ -554,7 +1272,7 @@ if "LULC" in analysis_type:
                              vis_params['palette'], labels)
 
 elif "LST" in analysis_type:
-    active_image = lst_current
+    active_image = layer('lst_current')
     v_min, v_max = round(avg_lst - 3, 1), round(avg_lst + 3, 1)
     step = round((v_max - v_min) / 5, 1)
     vis_params = {'min': v_min, 'max': v_max, 'palette': [
@@ -565,7 +1283,7 @@ elif "LST" in analysis_type:
                              vis_params['palette'], labels)
 
 elif "NDWI" in analysis_type:
-    active_image = ndwi_current
+    active_image = layer('ndwi_current')
     v_min, v_max = round(avg_ndwi - 0.2, 2), round(avg_ndwi + 0.2, 2)
     step = round((v_max - v_min) / 5, 2)
     vis_params = {'min': v_min, 'max': v_max, 'palette': [
@@ -576,7 +1294,7 @@ elif "NDWI" in analysis_type:
         "Sentinel-2 Moisture Availability", vis_params['palette'], labels)
 
 elif "Biomass" in analysis_type or "NDVI" in analysis_type:
-    active_image = ndvi_current
+    active_image = layer('ndvi_current')
     v_min, v_max = round(avg_ndvi - 0.2, 2), round(avg_ndvi + 0.3, 2)
     step = round((v_max - v_min) / 5, 2)
     vis_params = {'min': v_min, 'max': v_max, 'palette': [
@@ -587,7 +1305,7 @@ elif "Biomass" in analysis_type or "NDVI" in analysis_type:
         "Sentinel-2 Vegetation Density", vis_params['palette'], labels)
 
 elif "Fertility" in analysis_type:
-    active_image = npk_proxy
+    active_image = layer('npk_proxy')
     export_scale = 10
     vis_params = {'min': -0.1, 'max': 0.5,
                   'palette': ['#a50026', '#d73027', '#f46d43', '#fdae61', '#a6d96a', '#1a9850']}
@@ -597,7 +1315,7 @@ elif "Fertility" in analysis_type:
                              vis_params['palette'], labels)
 
 elif "Transport" in analysis_type:
-    active_image = slope
+    active_image = layer('slope')
     export_scale = 30
     vis_params = {'min': 0, 'max': 20, 'palette': [
         '#1a9850', '#91cf60', '#fee08b', '#fc8d59', '#d73027']}
@@ -607,7 +1325,7 @@ elif "Transport" in analysis_type:
                              vis_params['palette'], labels)
 
 elif "Rainfall" in analysis_type:
-    active_image = rain_current
+    active_image = layer('rain_current')
     r_min = max(0, int(avg_rain - 300))
     r_max = int(avg_rain + 300)
     step = (r_max - r_min) // 5
@@ -619,7 +1337,7 @@ elif "Rainfall" in analysis_type:
                              vis_params['palette'], labels)
 
 elif "Mineral" in analysis_type:
-    active_image = mineral_composite
+    active_image = layer('mineral_composite')
     vis_params = {'bands': ['Iron', 'Ferrous', 'Clay'], 'min': 0.5, 'max': 2.0}
     labels = ['Iron Oxides (B4/B2)', 'Ferrous Minerals (B6/B5)',
               'Clay / Hydrothermal (B6/B7)', 'Mixed Mineralogy']
@@ -627,12 +1345,13 @@ elif "Mineral" in analysis_type:
                              '#ff0000', '#00ff00', '#0000ff', '#ffffff'], labels)
 
 try:
-    center = study_area.geometry().centroid().getInfo()['coordinates']
+    center = center_future.result()
 except:
     center = [77.9339, 10.2789]
 
 m_single = folium.Map(location=[center[1], center[0]],
                       zoom_start=9, tiles="CartoDB positron", control_scale=False)
+profiler.mark("11b. MAP ID GENERATION")
 try:
     map_id = ee.Image(active_image).getMapId(vis_params)
     folium.raster_layers.TileLayer(
@@ -644,11 +1363,15 @@ try:
 except Exception as e:
     st.error("⚠️ **Telemetry Masked:** Imagery temporarily unavailable due to dense atmospheric cloud cover.")
 
+profiler.mark("11c. FOLIUM HTML & ST_FOLIUM PAYLOAD")
+if PROFILE_MODE:
+    profiler.context['folium_html_bytes'] = len(m_single.get_root().render())
 st_folium(m_single, width=1200, height=500, returned_objects=[])
 
 # ==========================================
-# 11. UI RENDERING PIPELINE (Action Matrix)
+# 12. UI RENDERING PIPELINE (Action Matrix)
 # ==========================================
+profiler.mark("12. UI RENDERING PIPELINE (Action Matrix)")
 st.markdown("<br>", unsafe_allow_html=True)
 st.markdown(f"<h2 style='text-align: center; color: #2ECC71;'>🎯 Dynamic Map-to-Policy Engine</h2>",
             unsafe_allow_html=True)
@@ -685,8 +1408,9 @@ with col_skill:
 st.markdown("---")
 
 # ==========================================
-# 12. UI RENDERING PIPELINE (Yield & Economy)
+# 13. UI RENDERING PIPELINE (Yield & Economy)
 # ==========================================
+profiler.mark("13. UI RENDERING PIPELINE (Yield & Economy)")
 col_weps, col_ml = st.columns(2)
 
 with col_weps:
@@ -705,8 +1429,9 @@ with col_ml:
 st.markdown("---")
 
 # ==========================================
-# 13. FINANCIALS, REPORTS & EXPORT
+# 14. FINANCIALS, REPORTS & EXPORT
 # ==========================================
+profiler.mark("14. FINANCIALS, REPORTS & EXPORT")
 col_econ, col_export = st.columns(2)
 
 with col_econ:
@@ -766,7 +1491,39 @@ Generated securely by AgriGeo-Shield Platform
             st.error(f"Failed to initiate export. Error: {e}")
 
 # ==========================================
-# 14. CREDIBILITY FOOTER
+# 15. CREDIBILITY FOOTER
 # ==========================================
+profiler.mark("15. CREDIBILITY FOOTER")
 st.markdown("---")
 st.caption("**🛰️ Validated Orbital Data Sources:** • **Sentinel-2** (10m Multispectral NDVI, NDWI) • **Terra MODIS** (1km Land Surface Temp) • **UCSB CHIRPS** (5km Climate Precipitation) • **Landsat 8** (30m SWIR Mineralogy) • **ESA WorldCover** (10m LULC Fusion)")
+
+# ==========================================
+# 16. PROFILING DEBUG PANEL (OPT-IN)
+# ==========================================
+profile_error = profiler.flush()
+if PROFILE_MODE:
+    if profile_error:
+        st.warning(f"Could not append to profile log {PROFILE_LOG}: {profile_error}")
+
+    with st.expander("🧪 Hot-Path Profiling Debug Panel", expanded=False):
+        df_profile = pd.DataFrame(profiler.sections)
+        st.write(f"**Total wall time:** {df_profile['wall_s'].sum():.2f} s | "
+                 f"**EE calls:** {df_profile['ee_calls'].sum()} | "
+                 f"**EE response bytes:** {df_profile['ee_bytes'].sum():,}")
+        st.dataframe(df_profile, use_container_width=True, hide_index=True)
+        if profiler.tasks:
+            st.markdown("**Pooled EE work by tag** (worker wall time, overlaps the sections above)")
+            st.dataframe(pd.DataFrame(profiler.tasks.values()), use_container_width=True, hide_index=True)
+        st.caption(f"Run context: {json.dumps(profiler.context)} | Logged to `{PROFILE_LOG}`")
+
+        if st.checkbox(f"Replay profile log (mean cost per layer, district & section, last {PROFILE_REPLAY_RECORDS} runs)"):
+            try:
+                with open(PROFILE_LOG) as f:
+                    recent = deque(f, maxlen=PROFILE_REPLAY_RECORDS)
+                rows = [dict(sec, layer=rec['context'].get('layer'), district=rec['context'].get('district'))
+                        for rec in map(json.loads, recent) for sec in rec['sections']]
+                df_replay = pd.DataFrame(rows).groupby(['layer', 'district', 'section'], as_index=False)[
+                    ['wall_s', 'cpu_s', 'ee_calls', 'ee_bytes']].mean()
+                st.dataframe(df_replay, use_container_width=True, hide_index=True)
+            except (OSError, ValueError, KeyError) as e:
+                st.warning(f"Profile log could not be replayed: {e}")